@@ -2,22 +2,16 @@
 Tool for computing stats on a TR VCF file
 """
 
-# Allow making plots even with no x-forward
-import matplotlib as mpl
-mpl.use('Agg')
-import matplotlib.pyplot as plt
-
-# Allow plots to be editable in Adobe Illustrator
-import matplotlib
-matplotlib.rcParams['pdf.fonttype'] = 42
-matplotlib.rcParams['ps.fonttype'] = 42
-
 # Imports
 import argparse
+import concurrent.futures
+import functools
 import os
+import queue
 import sys
+import threading
 import time
-from typing import Any, List
+from typing import Any, List, Optional
 
 import numpy as np
 
@@ -28,10 +22,111 @@ from trtools import __version__
 
 MAXPLOTS = 10 # don't plot more than this many allele freqs
 
+def _load_matplotlib():
+    """Import and configure matplotlib on first use
+
+    Importing matplotlib takes hundreds of milliseconds and several MB
+    of memory, so it is deferred until plots are actually requested;
+    runs that only compute stats skip it entirely. Repeat calls are
+    cheap since python caches the import.
+    """
+    # Allow making plots even with no x-forward
+    import matplotlib
+    matplotlib.use('Agg')
+    # Allow plots to be editable in Adobe Illustrator
+    matplotlib.rcParams['pdf.fonttype'] = 42
+    matplotlib.rcParams['ps.fonttype'] = 42
+    import matplotlib.pyplot as plt
+    return plt
+
+class _PrefetchIterator:
+    """Drain an iterator from a background thread
+
+    A daemon thread reads ahead into a bounded queue, so VCF
+    decompression and parsing (during which cyvcf2 releases the GIL)
+    overlap with the python-side stat computation in the consumer.
+    Exceptions raised by the underlying iterator are re-raised in the
+    consuming thread.
+    """
+
+    _DONE = object() # sentinel marking the end of the underlying iterator
+
+    def __init__(self, iterable, maxsize=64):
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._error = None
+        self._thread = threading.Thread(
+            target=self._produce, args=(iterable,), daemon=True
+        )
+        self._thread.start()
+
+    def _produce(self, iterable):
+        try:
+            for item in iterable:
+                self._queue.put(item)
+        except Exception as ex:
+            self._error = ex
+        finally:
+            self._queue.put(self._DONE)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        item = self._queue.get()
+        if item is self._DONE:
+            if self._error is not None:
+                raise self._error
+            raise StopIteration
+        return item
+
+def _allele_stats_numpy(alleles, freqs):
+    """Compute (mean, variance, heterozygosity, entropy, mode) at once
+
+    Both arrays must be nonempty float arrays with alleles in ascending
+    order; ties in mode resolve to the smallest allele.
+    """
+    mean = float(alleles @ freqs)
+    variance = float(((alleles - mean)**2) @ freqs)
+    het = 1.0 - float(freqs @ freqs)
+    # + 0.0 normalizes the -0.0 a monomorphic locus would produce
+    entropy = -float(freqs @ np.log2(freqs)) + 0.0
+    mode = float(alleles[np.argmax(freqs)])
+    return mean, variance, het, entropy, mode
+
+try:
+    import numba
+except ImportError:
+    # numba is optional; fall back to the vectorized numpy kernel
+    _allele_stats = _allele_stats_numpy
+else:
+    @numba.njit(cache=True)
+    def _allele_stats(alleles, freqs): # pragma: no cover
+        # single fused pass over the allele arrays, compiled to
+        # machine code; semantics match _allele_stats_numpy
+        mean = 0.0
+        sumsq = 0.0
+        entropy = 0.0
+        mode_freq = -1.0
+        mode = np.nan
+        for i in range(len(freqs)):
+            f = freqs[i]
+            mean += alleles[i]*f
+            sumsq += f*f
+            entropy -= f*np.log2(f)
+            if f > mode_freq:
+                mode_freq = f
+                mode = alleles[i]
+        variance = 0.0
+        for i in range(len(freqs)):
+            variance += freqs[i]*(alleles[i] - mean)**2
+        # + 0.0 normalizes -0.0 as in _allele_stats_numpy
+        return mean, variance, 1.0 - sumsq, entropy + 0.0, mode
+
 def PlotAlleleFreqs(trrecord,
                     outprefix,
-                    sample_indexes: List[Any] = [None],
-                    sampleprefixes=None):
+                    sample_indexes: Optional[List[Any]] = None,
+                    sampleprefixes=None,
+                    ax=None):
     r"""Plot allele frequencies for a locus
 
     Parameters
@@ -50,8 +145,13 @@ def PlotAlleleFreqs(trrecord,
           Can contain None for all samples.
     sampleprefixes : list of str, optional
           Prefixes for each sample list to use in legend
+    ax : matplotlib.axes.Axes, optional
+          Axes to draw on. If given, the axes are cleared and reused,
+          which avoids recreating a figure for every plotted locus.
+          If None, a new figure is created and closed after saving.
     """
-    if sample_indexes == [None]:
+    sample_indexes = sample_indexes or [None]
+    if len(sample_indexes) == 1 and sample_indexes[0] is None:
         sampleprefixes = ["sample"]
     allele_freqs_list = []
     allele_set = set()
@@ -65,10 +165,24 @@ def PlotAlleleFreqs(trrecord,
 
     fname = outprefix + "-%s-%s.pdf"%(trrecord.vcfrecord.CHROM, trrecord.vcfrecord.POS)
     w = 1.0/(len(sample_indexes)+0.3)
-    fig = plt.figure()
-    ax = fig.add_subplot(111)
+    if ax is None:
+        own_fig = True
+        fig = _load_matplotlib().figure()
+        ax = fig.add_subplot(111)
+    else:
+        own_fig = False
+        ax.cla()
+        fig = ax.figure
     for i in range(len(sample_indexes)):
-        ax.bar([item+i*w for item in bins], [allele_freqs_list[i].get(item, 0) for item in bins],
+        # fill a height array from the freq dict instead of one dict
+        # lookup per bin; only alleles that land exactly on a bin get a
+        # bar, as before
+        heights = np.zeros(len(bins))
+        for allele, freq in allele_freqs_list[i].items():
+            idx = int(allele - min_allele)
+            if 0 <= idx < len(bins) and bins[idx] == allele:
+                heights[idx] = freq
+        ax.bar(bins + i*w, heights,
                label=sampleprefixes[i], width=w*1.1)
     ax.legend()
     ax.set_xlabel("TR allele (num. %s rpts)"%trrecord.motif, size=15)
@@ -77,7 +191,8 @@ def PlotAlleleFreqs(trrecord,
     ax.set_yticklabels(["%.2f"%item for item in ax.get_yticks()], size=12)
     fig.tight_layout()
     fig.savefig(fname)
-    plt.close()
+    if own_fig:
+        _load_matplotlib().close(fig)
 
 def GetHeader(header, sample_prefixes):
     r"""Return header items for a column
@@ -101,7 +216,40 @@ def GetHeader(header, sample_prefixes):
             header_items.append(header+"-"+sp)
         return header_items
 
-def GetThresh(trrecord: trh.TRRecord, sample_indexes: List[Any] = [None]) -> List[float]:
+def _format_allele_dict(allele_dict, val_fmt):
+    """Format an allele dict as 'allele1:val1,allele2:val2,...'
+
+    Alleles appear in ascending order. Length alleles are formatted in
+    bulk with numpy rather than one python format call per allele;
+    sequence alleles fall back to a per-allele join.
+
+    Parameters
+    ----------
+    allele_dict : dict of object: float
+          Allele frequencies or counts keyed by allele
+    val_fmt : str
+          Percent-style format for the values, e.g. '%.3f' or '%i'
+
+    Returns
+    -------
+    str
+          The formatted pairs, or '.' if the dict is empty
+    """
+    # allele dicts from trh are built from np.unique output, so they are
+    # already in ascending order and need no re-sort here
+    if not allele_dict:
+        return "."
+    if isinstance(next(iter(allele_dict)), str):
+        return ",".join([("%s:" + val_fmt)%item for item in allele_dict.items()])
+    keys = np.fromiter(allele_dict.keys(), dtype=np.float64, count=len(allele_dict))
+    vals = np.fromiter(allele_dict.values(), dtype=np.float64, count=len(allele_dict))
+    # astype(str) lets numpy size the string dtype to the longest key;
+    # a fixed width would truncate fractional repeat counts
+    pairs = np.char.add(np.char.add(keys.astype(str), ":"),
+                        np.char.mod(val_fmt, vals))
+    return ",".join(pairs.tolist())
+
+def GetThresh(trrecord: trh.TRRecord, sample_indexes: Optional[List[Any]] = None) -> List[float]:
     """Return the maximum TR allele length observed
 
     Parameters
@@ -123,10 +271,11 @@ def GetThresh(trrecord: trh.TRRecord, sample_indexes: List[Any] = [None]) -> Lis
           List of Maximum allele length observed in each sample group,
           or nan if no alleles called
     """
+    sample_indexes = sample_indexes or [None]
     return [trrecord.GetMaxAllele(sample_index=si) for si in sample_indexes]
 
 def GetAFreq(trrecord: trh.TRRecord,
-             sample_indexes: List[Any] = [None],
+             sample_indexes: Optional[List[Any]] = None,
              count: bool = False,
              uselength: bool = True) -> List[str]:
     """Return allele frequency for a TR
@@ -155,25 +304,20 @@ def GetAFreq(trrecord: trh.TRRecord,
           Only alleles with more than one call in a group are reported for
           that group. Groups with no called alleles are reported as '.'
     """
+    sample_indexes = sample_indexes or [None]
     allele_freqs_strs = []
     for si in sample_indexes:
         if count:
             allele_counts = trrecord.GetAlleleCounts(uselength=uselength, sample_index=si)
-            if len(allele_counts.keys()) == 0:
-                allele_freqs_strs.append(".")
-            else:
-                allele_freqs_strs.append(",".join(["%s:%i"%(a, allele_counts.get(a, 0)) for a in sorted(allele_counts.keys())]))
+            allele_freqs_strs.append(_format_allele_dict(allele_counts, "%i"))
         else:
             allele_freqs = trrecord.GetAlleleFreqs(uselength=uselength, sample_index=si)
-            if len(allele_freqs.keys()) == 0:
-                allele_freqs_strs.append(".")
-            else:
-                allele_freqs_strs.append(",".join(["%s:%.3f"%(a, allele_freqs.get(a, 0)) for a in sorted(allele_freqs.keys())]))
+            allele_freqs_strs.append(_format_allele_dict(allele_freqs, "%.3f"))
     return allele_freqs_strs
 
 def GetNAlleles(
     trrecord: trh.TRRecord,
-    sample_indexes: List[Any] = [None],
+    sample_indexes: Optional[List[Any]] = None,
     nalleles_thresh: float = 0.01,
     uselength: bool = True,
 ) -> List[int]:
@@ -201,6 +345,7 @@ def GetNAlleles(
     List[int]:
         Number of called alleles at this locus per sample index. Zero if no alleles were called.
     """
+    sample_indexes = sample_indexes or [None]
     nalleles = []
     for si in sample_indexes:
         allele_freqs = trrecord.GetAlleleFreqs(uselength=uselength, sample_index=si)
@@ -208,7 +353,7 @@ def GetNAlleles(
     return nalleles
 
 def GetHWEP(trrecord: trh.TRRecord,
-            sample_indexes: List[Any] = [None],
+            sample_indexes: Optional[List[Any]] = None,
             uselength: bool = True) -> List[float]:
     """Compute Hardy Weinberg p-value
 
@@ -240,6 +385,7 @@ def GetHWEP(trrecord: trh.TRRecord,
           If the genotype alleles not included in frequencies dictionary, return np.nan
           One value returned for each sample_index
     """
+    sample_indexes = sample_indexes or [None]
     pvals = []
     for si in sample_indexes:
         allele_freqs = trrecord.GetAlleleFreqs(sample_index=si, uselength=uselength)
@@ -248,7 +394,7 @@ def GetHWEP(trrecord: trh.TRRecord,
     return pvals
 
 def GetHet(trrecord: trh.TRRecord,
-            sample_indexes: List[Any] = [None],
+            sample_indexes: Optional[List[Any]] = None,
             uselength: bool = True) -> List[float]:
     """Compute heterozygosity of a locus
 
@@ -276,6 +422,7 @@ def GetHet(trrecord: trh.TRRecord,
           For each sample list, the heterozypostiy of the calls for those
           samples, or np.nan if no such calls
     """
+    sample_indexes = sample_indexes or [None]
     hetvals = []
     for si in sample_indexes:
         allele_freqs = trrecord.GetAlleleFreqs(sample_index=si, uselength=uselength)
@@ -283,7 +430,7 @@ def GetHet(trrecord: trh.TRRecord,
     return hetvals
 
 def GetEntropy(trrecord: trh.TRRecord,
-               sample_indexes: List[Any] = [None],
+               sample_indexes: Optional[List[Any]] = None,
                uselength: bool = True) -> List[float]:
     """Compute the entropy of a locus
 
@@ -313,6 +460,7 @@ def GetEntropy(trrecord: trh.TRRecord,
           For each sample list, the entropy of the calls for those
           samples, or np.nan if no such calls
     """
+    sample_indexes = sample_indexes or [None]
     entropy_vals = []
     for si in sample_indexes:
         allele_freqs = trrecord.GetAlleleFreqs(sample_index=si, uselength=uselength)
@@ -320,7 +468,7 @@ def GetEntropy(trrecord: trh.TRRecord,
     return entropy_vals
 
 def GetMean(trrecord: trh.TRRecord,
-            sample_indexes: List[Any] = [None],
+            sample_indexes: Optional[List[Any]] = None,
             uselength: bool = True) -> List[float]:
     """Compute the mean allele length
 
@@ -344,11 +492,12 @@ def GetMean(trrecord: trh.TRRecord,
           calls for that sample
     """
 
+    sample_indexes = sample_indexes or [None]
     return [utils.GetMean(trrecord.GetAlleleFreqs(sample_index=si, uselength=True))
             for si in sample_indexes]
 
 def GetMode(trrecord: trh.TRRecord,
-            sample_indexes: List[Any] = [None],
+            sample_indexes: Optional[List[Any]] = None,
             uselength: bool = True) -> List[float]:
     """Compute the mode of the allele lengths
 
@@ -372,10 +521,11 @@ def GetMode(trrecord: trh.TRRecord,
           calls for that sample
     """
 
+    sample_indexes = sample_indexes or [None]
     return [utils.GetMode(trrecord.GetAlleleFreqs(sample_index=si, uselength=True)) for si in sample_indexes]
 
 def GetVariance(trrecord: trh.TRRecord,
-                sample_indexes: List[Any] = [None],
+                sample_indexes: Optional[List[Any]] = None,
                 uselength: bool = True) -> List[float]:
     """Compute the variance of the allele lengths
 
@@ -399,9 +549,10 @@ def GetVariance(trrecord: trh.TRRecord,
           no calls for that sample
     """
 
+    sample_indexes = sample_indexes or [None]
     return [utils.GetVariance(trrecord.GetAlleleFreqs(sample_index=si, uselength=True)) for si in sample_indexes]
 
-def GetNumSamples(trrecord, sample_indexes=[None]):
+def GetNumSamples(trrecord, sample_indexes=None):
     r"""Compute the number of samples
 
     Parameters
@@ -423,8 +574,286 @@ def GetNumSamples(trrecord, sample_indexes=[None]):
           The number of samples. One value for each sample list
           If the allele frequencies dictionary is invalid, return np.nan
     """
+    sample_indexes = sample_indexes or [None]
     return [sum(trrecord.GetGenotypeCounts(sample_index=si).values()) for si in sample_indexes]
 
+def _compute_record_stats(trrecord, sample_indexes, args, afreq_format="%.3f"):
+    r"""Compute all requested per-locus stats in a single pass
+
+    Many of the stats are derived from the same underlying allele
+    frequency and genotype count dictionaries. Rather than having each
+    stat recompute those, call trrecord.GetAlleleCounts and
+    trrecord.GetGenotypeCounts at most once per sample group and
+    uselength setting, cache the results, and derive every requested
+    statistic from the cached dictionaries.
+
+    Parameters
+    ----------
+    trrecord: trh.TRRecord object
+          The record that we are computing the statistics for
+    sample_indexes:
+          A list of indexes into the numpy rows array to extract subsets of
+          genotypes to stratify over.
+          Can contain None for all samples.
+    args: argparse.Namespace
+          The parsed command line arguments, used to determine which
+          statistics to compute
+    afreq_format: str
+          Percent-style format for allele frequency values
+
+    Returns
+    -------
+    stats: dict of str: list
+          Maps each requested statistic name to its values,
+          one value per sample group, in the same order as sample_indexes
+    """
+    allele_counts_cache = {}
+    allele_freqs_cache = {}
+    genotype_counts_cache = {}
+    stat_arrays_cache = {}
+
+    def allele_counts(si_idx, uselength):
+        key = (si_idx, uselength)
+        if key not in allele_counts_cache:
+            allele_counts_cache[key] = trrecord.GetAlleleCounts(
+                sample_index=sample_indexes[si_idx], uselength=uselength
+            )
+        return allele_counts_cache[key]
+
+    def allele_freqs(si_idx, uselength):
+        key = (si_idx, uselength)
+        if key not in allele_freqs_cache:
+            counts = allele_counts(si_idx, uselength)
+            total = float(sum(counts.values()))
+            allele_freqs_cache[key] = \
+                {allele: count / total for allele, count in counts.items()}
+        return allele_freqs_cache[key]
+
+    def genotype_counts(si_idx, uselength):
+        key = (si_idx, uselength)
+        if key not in genotype_counts_cache:
+            genotype_counts_cache[key] = trrecord.GetGenotypeCounts(
+                sample_index=sample_indexes[si_idx], uselength=uselength
+            )
+        return genotype_counts_cache[key]
+
+    def stat_arrays(si_idx, uselength):
+        # alleles and frequencies as parallel numpy arrays, so the
+        # numeric stats below are single vectorized expressions instead
+        # of python loops over dict items. The allele array is only
+        # built for length alleles (sequence alleles are not numeric).
+        key = (si_idx, uselength)
+        if key not in stat_arrays_cache:
+            freqs = allele_freqs(si_idx, uselength)
+            f = np.fromiter(freqs.values(), dtype=np.float64, count=len(freqs))
+            if uselength:
+                a = np.fromiter(freqs.keys(), dtype=np.float64, count=len(freqs))
+            else:
+                a = None
+            stat_arrays_cache[key] = (a, f)
+        return stat_arrays_cache[key]
+
+    fused_stats_cache = {}
+
+    def fused_stats(si_idx):
+        # one _allele_stats kernel call per sample group covers
+        # mean/variance/het/entropy/mode over the length alleles
+        if si_idx not in fused_stats_cache:
+            a, f = stat_arrays(si_idx, True)
+            if f.size == 0:
+                fused_stats_cache[si_idx] = (np.nan,)*5
+            else:
+                fused_stats_cache[si_idx] = _allele_stats(a, f)
+        return fused_stats_cache[si_idx]
+
+    def mean(si_idx):
+        return fused_stats(si_idx)[0]
+
+    def variance(si_idx):
+        return fused_stats(si_idx)[1]
+
+    def mode(si_idx):
+        # alleles are in ascending order, so the kernel picks the
+        # smallest allele among ties, matching utils.GetMode
+        return fused_stats(si_idx)[4]
+
+    def heterozygosity(si_idx, uselength):
+        if uselength:
+            return fused_stats(si_idx)[2]
+        _, f = stat_arrays(si_idx, uselength)
+        if f.size == 0:
+            return np.nan
+        return 1.0 - float(f @ f)
+
+    def entropy(si_idx, uselength):
+        if uselength:
+            return fused_stats(si_idx)[3]
+        _, f = stat_arrays(si_idx, uselength)
+        if f.size == 0:
+            return np.nan
+        # + 0.0 normalizes the -0.0 a monomorphic locus would produce
+        return -float(f @ np.log2(f)) + 0.0
+
+    ngroups = range(len(sample_indexes))
+    stats = {}
+    if args.thresh:
+        stats["thresh"] = [
+            max(allele_counts(i, True)) if allele_counts(i, True) else np.nan
+            for i in ngroups
+        ]
+    if args.afreq:
+        stats["afreq"] = [
+            _format_allele_dict(allele_freqs(i, args.use_length), afreq_format)
+            for i in ngroups
+        ]
+    if args.acount:
+        stats["acount"] = [
+            _format_allele_dict(allele_counts(i, args.use_length), "%i")
+            for i in ngroups
+        ]
+    if args.nalleles:
+        stats["nalleles"] = [
+            len([None for _, freq in allele_freqs(i, args.use_length).items()
+                 if freq >= args.nalleles_thresh])
+            for i in ngroups
+        ]
+    if args.hwep:
+        hwep_vals = []
+        for i in ngroups:
+            freqs = allele_freqs(i, args.use_length)
+            if not freqs:
+                # nothing called at this locus for this group; skip the
+                # genotype count pass entirely
+                hwep_vals.append(np.nan)
+            else:
+                hwep_vals.append(utils.GetHardyWeinbergBinomialTest(
+                    freqs, genotype_counts(i, args.use_length)
+                ))
+        stats["hwep"] = hwep_vals
+    if args.het:
+        stats["het"] = [heterozygosity(i, args.use_length) for i in ngroups]
+    if args.entropy:
+        stats["entropy"] = [entropy(i, args.use_length) for i in ngroups]
+    if args.mean:
+        stats["mean"] = [mean(i) for i in ngroups]
+    if args.mode:
+        stats["mode"] = [mode(i) for i in ngroups]
+    if args.var:
+        stats["var"] = [variance(i) for i in ngroups]
+    if args.numcalled:
+        stats["numcalled"] = [sum(genotype_counts(i, True).values())
+                              for i in ngroups]
+    return stats
+
+def _record_stats_line(trrecord, sample_indexes, args,
+                       precision, afreq_format):
+    r"""Format the output line for one record
+
+    Computes the requested stats and accumulates the columns into a
+    single string, so callers issue one write per record instead of one
+    write call per column.
+
+    Parameters
+    ----------
+    trrecord: trh.TRRecord object
+          The record that we are computing the statistics for
+    sample_indexes:
+          A list of indexes into the numpy rows array to extract subsets of
+          genotypes to stratify over.
+          Can contain None for all samples.
+    args: argparse.Namespace
+          The parsed command line arguments
+    precision: int
+          Number of digits of precision for numeric stat values
+    afreq_format: str
+          Percent-style format for allele frequency values
+
+    Returns
+    -------
+    line: str
+          The tab-separated, newline-terminated output line
+    """
+    stats = _compute_record_stats(trrecord, sample_indexes, args,
+                                  afreq_format=afreq_format)
+    record = trrecord.vcfrecord
+    parts = [f"{record.CHROM}\t{record.POS}"
+             f"\t{record.POS + len(trrecord.ref_allele)}"]
+    if args.thresh:
+        for val in stats["thresh"]:
+            parts.append(format_nan_precision(precision, val))
+    if args.afreq:
+        for val in stats["afreq"]:
+            parts.append("\t" + str(val))
+    if args.acount:
+        for val in stats["acount"]:
+            parts.append("\t" + str(val))
+    if args.nalleles:
+        for val in stats["nalleles"]:
+            parts.append("\t" + str(val))
+    if args.hwep:
+        for val in stats["hwep"]:
+            parts.append(format_nan_precision(precision, val))
+    if args.het:
+        for val in stats["het"]:
+            parts.append(format_nan_precision(precision, val))
+    if args.entropy:
+        for val in stats["entropy"]:
+            parts.append(format_nan_precision(precision, val))
+    if args.mean:
+        for val in stats["mean"]:
+            parts.append(format_nan_precision(precision, val))
+    if args.mode:
+        for val in stats["mode"]:
+            parts.append(format_nan_precision(precision, val))
+    if args.var:
+        for val in stats["var"]:
+            parts.append(format_nan_precision(precision, val))
+    if args.numcalled:
+        for val in stats["numcalled"]:
+            parts.append("\t" + str(val))
+    parts.append("\n")
+    return "".join(parts)
+
+def _process_chrom(chrom, vcf_loc, vcftype, sample_indexes, args,
+                   precision, afreq_format):
+    r"""Compute stats for all records on one chromosome
+
+    Worker function for multithreaded runs. Each worker process opens
+    its own reader (cyvcf2 readers cannot be shared across processes)
+    and streams the records for its chromosome.
+
+    Parameters
+    ----------
+    chrom: str
+          The chromosome to process
+    vcf_loc: str
+          Location of the bgzipped, indexed VCF file
+    vcftype: trh.VcfTypes
+          The type of the VCF file
+    sample_indexes:
+          A list of indexes into the numpy rows array to extract subsets of
+          genotypes to stratify over.
+          Can contain None for all samples.
+    args: argparse.Namespace
+          The parsed command line arguments
+    precision: int
+          Number of digits of precision for numeric stat values
+    afreq_format: str
+          Percent-style format for allele frequency values
+
+    Returns
+    -------
+    lines: str
+          The concatenated output lines for the chromosome
+    """
+    invcf = utils.LoadSingleReader(vcf_loc, checkgz=True)
+    harmonize = trh.GetHarmonizer(vcftype)
+    lines = []
+    for record in invcf(chrom):
+        lines.append(_record_stats_line(harmonize(record), sample_indexes,
+                                        args, precision, afreq_format))
+    return "".join(lines)
+
 def getargs(): # pragma: no cover
     parser = argparse.ArgumentParser(
         __doc__,
@@ -441,6 +870,15 @@ def getargs(): # pragma: no cover
         required=True
     )
     inout_group.add_argument("--vcftype", help="Options=%s"%[str(item) for item in trh.VcfTypes.__members__], type=str, default="auto")
+    inout_group.add_argument(
+        "--threads",
+        help=("Number of processes to use. Values greater than 1 require the "
+              "input VCF to be bgzipped and tabix indexed, and records are "
+              "processed one chromosome per process. Cannot be combined with "
+              "--region or --plot-afreq."),
+        type=int,
+        default=1
+    )
     inout_group.add_argument(
         "--precision",
         help="How much precision to use when printing decimals",
@@ -485,11 +923,12 @@ def getargs(): # pragma: no cover
 
     return args
 
-def format_nan_precision(precision_format, val):
-    if np.isnan(val):
+def format_nan_precision(precision, val):
+    # val != val is the cheap nan check for plain python floats
+    if val != val:
         return "\tnan"
     else:
-        return precision_format.format(val)
+        return f"\t{val:.{precision}}"
 
 def main(args):
     if not os.path.exists(args.vcf):
@@ -506,7 +945,16 @@ def main(args):
                        "directory".format(args.out))
         return 1
 
-    checkgz = args.region is not None
+    if args.threads > 1 and args.plot_afreq:
+        common.WARNING("Cannot generate plots with multiple threads, "
+                       "running single threaded")
+        args.threads = 1
+    if args.threads > 1 and args.region:
+        common.WARNING("Cannot use --threads with --region, "
+                       "running single threaded")
+        args.threads = 1
+
+    checkgz = args.region is not None or args.threads > 1
     invcf = utils.LoadSingleReader(args.vcf, checkgz=checkgz)
     if invcf is None:
         return 1
@@ -529,13 +977,16 @@ def main(args):
             common.WARNING("--sample-prefixes must be same length as --samples")
             return 1
         for sf in sfiles:
-            sample_list = np.array(
-                [item.strip() for item in open(sf, "r").readlines()]
-            )
-            if not np.any(np.isin(all_samples, sample_list)):
+            with open(sf, "r") as sfile:
+                sample_list = np.array([line.strip() for line in sfile])
+            # convert the sample list to an integer index array once here
+            # so per-record genotype subsetting is a direct numpy take
+            # instead of rebuilding sample membership for each record
+            sample_index = np.flatnonzero(np.isin(all_samples, sample_list))
+            if sample_index.size == 0:
                 common.WARNING("No samples from {} found in the VCF file".format(sf))
                 return 1
-            sample_indexes.append(np.isin(all_samples, sample_list))
+            sample_indexes.append(sample_index)
     else:
         sample_indexes = [None] # None is used to mean all samples
 
@@ -552,7 +1003,8 @@ def main(args):
     if args.var: header.extend(GetHeader("var", sample_prefixes))
     if args.numcalled: header.extend(GetHeader("numcalled", sample_prefixes))
 
-    precision_format = "\t{:." + str(args.precision) + "}"
+    afreq_format = "%.3f" # allele freqs are always printed with 3 decimals
+    plot_ax = None
     try:
         if args.out == "stdout":
             if args.plot_afreq:
@@ -563,75 +1015,70 @@ def main(args):
             outf = open(args.out + ".tab", "w")
         outf.write("\t".join(header)+"\n")
 
-        if args.region:
-            region = invcf(args.region)
-        else: region = invcf
-        num_plotted = 0
-
-        start_time = time.time()
-        nrecords = 0
-        for record in region:
-            nrecords += 1
-
-            trrecord = trh.HarmonizeRecord(vcftype, record)
-            if args.plot_afreq and num_plotted <= MAXPLOTS:
-                PlotAlleleFreqs(trrecord, args.out, sample_indexes=sample_indexes, sampleprefixes=sample_prefixes)
-                num_plotted += 1
-            outf.write(str(record.CHROM) + "\t"
-                       + str(record.POS) + "\t"
-                       + str(record.POS+len(trrecord.ref_allele)))
-            if args.thresh:
-                for val in GetThresh(trrecord, sample_indexes=sample_indexes):
-                    outf.write(format_nan_precision(precision_format, val))
-            if args.afreq:
-                for val in GetAFreq(trrecord, sample_indexes=sample_indexes,
-                                    uselength=args.use_length):
-                    outf.write("\t" + str(val))
-            if args.acount:
-                for val in GetAFreq(trrecord, sample_indexes=sample_indexes,
-                                    uselength=args.use_length, count=True):
-                    outf.write("\t" + str(val))
-            if args.nalleles:
-                for val in GetNAlleles(
-                    trrecord, nalleles_thresh = args.nalleles_thresh, sample_indexes=sample_indexes, uselength=args.use_length
-                ):
-                    outf.write("\t" + str(val))
-            if args.hwep:
-                for val in GetHWEP(trrecord, sample_indexes=sample_indexes,
-                                   uselength=args.use_length):
-                    outf.write(format_nan_precision(precision_format, val))
-            if args.het:
-                for val in GetHet(trrecord, sample_indexes=sample_indexes,
-                                  uselength=args.use_length):
-                    outf.write(format_nan_precision(precision_format, val))
-            if args.entropy:
-                for val in GetEntropy(trrecord, sample_indexes=sample_indexes,
-                                      uselength=args.use_length):
-                    outf.write(format_nan_precision(precision_format, val))
-            if args.mean:
-                for val in GetMean(trrecord, sample_indexes=sample_indexes):
-                    outf.write(format_nan_precision(precision_format, val))
-            if args.mode:
-                for val in GetMode(trrecord, sample_indexes=sample_indexes):
-                    outf.write(format_nan_precision(precision_format, val))
-            if args.var:
-                for val in GetVariance(trrecord, sample_indexes=sample_indexes):
-                    outf.write(format_nan_precision(precision_format, val))
-            if args.numcalled:
-                for val in GetNumSamples(trrecord, sample_indexes=sample_indexes):
-                    outf.write("\t" + str(val))
-            outf.write("\n")
-            if nrecords % 50 == 0:
-                outf.flush()
-            if args.out != "stdout" and nrecords % 50 == 0:
-                print(
-                    "Finished {} records, time/record={:.5}sec".format(
-                        nrecords, (time.time() - start_time)/nrecords
-                    ),
-                    flush=True,
-                    end="\r"
-                )
+        if args.threads > 1:
+            # ship only the stat settings to the workers; the full args
+            # object is not guaranteed to be picklable
+            stat_args = argparse.Namespace(
+                **{key: getattr(args, key) for key in (
+                    "thresh", "afreq", "acount", "nalleles",
+                    "nalleles_thresh", "hwep", "het", "entropy", "mean",
+                    "mode", "var", "numcalled", "use_length")}
+            )
+            # one worker per chromosome; executor.map returns results in
+            # submission order so the output stays deterministic
+            worker = functools.partial(
+                _process_chrom,
+                vcf_loc=args.vcf,
+                vcftype=vcftype,
+                sample_indexes=sample_indexes,
+                args=stat_args,
+                precision=args.precision,
+                afreq_format=afreq_format,
+            )
+            with concurrent.futures.ProcessPoolExecutor(
+                    max_workers=args.threads) as executor:
+                for chunk in executor.map(worker, invcf.seqnames):
+                    outf.write(chunk)
+                    outf.flush()
+        else:
+            if args.region:
+                region = invcf(args.region)
+            else: region = invcf
+            num_plotted = 0
+            if args.plot_afreq:
+                # one reusable figure for all plotted loci; matplotlib
+                # figure construction is slow enough to matter per record
+                plot_ax = _load_matplotlib().figure().add_subplot(111)
+
+            harmonize = trh.GetHarmonizer(vcftype)
+            report_progress = args.out != "stdout"
+            start_time = time.perf_counter()
+            nrecords = 0
+            flush_in = 50 # countdown to the next flush/progress report
+            for record in _PrefetchIterator(region):
+                nrecords += 1
+
+                trrecord = harmonize(record)
+                if args.plot_afreq and num_plotted <= MAXPLOTS:
+                    PlotAlleleFreqs(trrecord, args.out, sample_indexes=sample_indexes, sampleprefixes=sample_prefixes, ax=plot_ax)
+                    num_plotted += 1
+                outf.write(_record_stats_line(trrecord, sample_indexes, args,
+                                              args.precision, afreq_format))
+                flush_in -= 1
+                if flush_in == 0:
+                    flush_in = 50
+                    outf.flush()
+                    if report_progress:
+                        print(
+                            "Finished {} records, time/record={:.5}sec".format(
+                                nrecords, (time.perf_counter() - start_time)/nrecords
+                            ),
+                            flush=True,
+                            end="\r"
+                        )
     finally:
+        if plot_ax is not None:
+            _load_matplotlib().close(plot_ax.figure)
         if outf is not None and args.out != "stdout":
             outf.close()
 
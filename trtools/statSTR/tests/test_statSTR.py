@@ -4,6 +4,7 @@ import os
 import pytest
 
 from ..statSTR import *
+from ..statSTR import _compute_record_stats
 
 
 # Set up base argparser
@@ -31,6 +32,7 @@ def args(tmpdir):
     args.numcalled = False
     args.entropy = False
     args.precision = 4
+    args.threads = 1
     return args
 
 # Test no such file or directory
@@ -89,6 +91,89 @@ def test_Stats2(args, vcfdir):
     args.region = "chr1:3045469-3045470"
     assert main(args)==0
 
+class _CountingRecord:
+    # wraps a TRRecord and counts the expensive genotype passes
+    def __init__(self, trrecord):
+        self._trrecord = trrecord
+        self.allele_count_calls = 0
+        self.genotype_count_calls = 0
+
+    def GetAlleleCounts(self, **kwargs):
+        self.allele_count_calls += 1
+        return self._trrecord.GetAlleleCounts(**kwargs)
+
+    def GetGenotypeCounts(self, **kwargs):
+        self.genotype_count_calls += 1
+        return self._trrecord.GetGenotypeCounts(**kwargs)
+
+
+def test_RecordStatsCached(args, vcfdir):
+    # requesting every stat must not recompute the underlying allele or
+    # genotype counts; with --use-length the user-controlled stats share
+    # the uselength=True computation, without it each is done once
+    fname = os.path.join(vcfdir, "few_samples_few_loci.vcf.gz")
+    invcf = utils.LoadSingleReader(fname, checkgz=False)
+    vcftype = trh.InferVCFType(invcf)
+    # use a record with called genotypes, otherwise hwep short-circuits
+    # without counting genotypes
+    for record in invcf:
+        trrecord = trh.HarmonizeRecord(vcftype, record)
+        if trrecord.GetAlleleCounts(uselength=False):
+            break
+    for stat in ("thresh", "afreq", "acount", "nalleles", "hwep", "het",
+                 "entropy", "mean", "mode", "var", "numcalled"):
+        setattr(args, stat, True)
+
+    args.use_length = True
+    counting = _CountingRecord(trrecord)
+    _compute_record_stats(counting, [None], args)
+    assert counting.allele_count_calls == 1
+    assert counting.genotype_count_calls == 1
+
+    args.use_length = False
+    counting = _CountingRecord(trrecord)
+    _compute_record_stats(counting, [None], args)
+    assert counting.allele_count_calls == 2
+    assert counting.genotype_count_calls == 2
+
+def test_MonomorphicEntropy(args, vcfdir):
+    # monomorphic loci must report an entropy of 0.0, not -0.0, for
+    # both length and sequence allele representations
+    fname = os.path.join(vcfdir, "test_gangstr.vcf")
+    args.entropy = True
+    for use_length in (True, False):
+        args.use_length = use_length
+        invcf = utils.LoadSingleReader(fname, checkgz=False)
+        vcftype = trh.InferVCFType(invcf)
+        found = False
+        for record in invcf:
+            trrecord = trh.HarmonizeRecord(vcftype, record)
+            if len(trrecord.GetAlleleFreqs(uselength=use_length)) != 1:
+                continue
+            found = True
+            val = _compute_record_stats(trrecord, [None], args)["entropy"][0]
+            assert val == 0 and not np.signbit(val)
+        assert found
+
+def test_Threads(args, vcfdir):
+    # a multithreaded run should produce the same output as a
+    # single threaded one
+    fname = os.path.join(vcfdir, "many_samples_multiple_chroms.vcf.gz")
+    args.vcf = fname
+    args.thresh = True
+    args.het = True
+    args.mean = True
+    args.acount = True
+    args.numcalled = True
+    single_out = args.out
+    assert main(args) == 0
+    args.out = single_out + "_threaded"
+    args.threads = 2
+    assert main(args) == 0
+    with open(single_out + ".tab") as single, \
+            open(args.out + ".tab") as threaded:
+        assert single.read() == threaded.read()
+
 def test_PlotAfreq(args, vcfdir):
     fname = os.path.join(vcfdir, "test_gangstr.vcf")
     args.vcf = fname
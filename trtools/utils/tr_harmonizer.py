@@ -259,22 +259,35 @@ def HarmonizeRecord(vcftype: Union[str, VcfTypes], vcfrecord: cyvcf2.Variant):
     TRRecord
         A TRRecord object built out of the input record
     """
-    vcftype = _ToVCFType(vcftype)
-    if vcftype == VcfTypes.gangstr:
-        return _HarmonizeGangSTRRecord(vcfrecord)
-    if vcftype == VcfTypes.hipstr:
-        return _HarmonizeHipSTRRecord(vcfrecord)
-    if vcftype == VcfTypes.advntr:
-        return _HarmonizeAdVNTRRecord(vcfrecord)
-    if vcftype == VcfTypes.eh:
-        return _HarmonizeEHRecord(vcfrecord)
-    if vcftype == VcfTypes.popstr:
-        return _HarmonizePopSTRRecord(vcfrecord)
+    return GetHarmonizer(vcftype)(vcfrecord)
 
-    # Can't cover this line because it is future proofing.
-    # (It explicitly is not reachable now,
-    # would only be reachable if VcfTypes is expanded in the future)
-    _UnexpectedTypeError(vcftype)  # pragma: no cover
+
+def GetHarmonizer(vcftype: Union[str, VcfTypes]):
+    """
+    Resolve the harmonization function for a VCF type.
+
+    Useful for hot loops: resolving the dispatch once before iterating
+    records avoids redoing the type lookup for every record.
+
+    Parameters
+    ----------
+    vcftype :
+        The type of the VCF the records will come from
+
+    Returns
+    -------
+    Callable[[cyvcf2.Variant], TRRecord]
+        A function that builds a TRRecord out of a cyvcf2.Variant
+        of that type
+    """
+    vcftype = _ToVCFType(vcftype)
+    try:
+        return _HARMONIZERS[vcftype]
+    except KeyError:
+        # Can't cover this line because it is future proofing.
+        # (It explicitly is not reachable now,
+        # would only be reachable if VcfTypes is expanded in the future)
+        _UnexpectedTypeError(vcftype)  # pragma: no cover
 
 
 def _HarmonizeGangSTRRecord(vcfrecord: cyvcf2.Variant):
@@ -530,6 +543,15 @@ def _HarmonizeEHRecord(vcfrecord: cyvcf2.Variant):
                     alt_allele_lengths=alt_allele_lengths)
 
 
+_HARMONIZERS = {
+    VcfTypes.gangstr: _HarmonizeGangSTRRecord,
+    VcfTypes.hipstr: _HarmonizeHipSTRRecord,
+    VcfTypes.advntr: _HarmonizeAdVNTRRecord,
+    VcfTypes.eh: _HarmonizeEHRecord,
+    VcfTypes.popstr: _HarmonizePopSTRRecord,
+}
+
+
 def _UpperCaseAlleles(alleles: List[str]):
     # Convert the list of allele strings to upper case
     upper_alleles = []
@@ -1351,9 +1373,9 @@ class TRRecord:
         if sample_index is not None:
             gts = gts[sample_index, :]
 
-        # remove no calls and missing haplotypes
-        gts = gts[gts != nocall_entry]
-        gts = gts[gts != lowploidy_entry]
+        # remove no calls and missing haplotypes in a single pass
+        # rather than materializing an intermediate filtered array
+        gts = gts[(gts != nocall_entry) & (gts != lowploidy_entry)]
 
         alleles, counts = np.unique(
             gts,
@@ -1432,8 +1454,8 @@ class TRRecord:
         # TODO should we have an option for grabbing
         # the index of the longest allele?
         alleles = self.GetAlleleCounts(uselength=True,
-                                       sample_index=sample_index).keys()
-        if len(alleles) == 0:
+                                       sample_index=sample_index)
+        if not alleles:
             return np.nan
         return max(alleles)
 
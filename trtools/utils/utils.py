@@ -117,7 +117,7 @@ def ValidateAlleleFreqs(allele_freqs):
     >>> ValidateAlleleFreqs({0:0.5, 1:0.5})
     True
     """
-    if len(allele_freqs.keys()) == 0: return False
+    if not allele_freqs: return False
     return abs(1-sum(allele_freqs.values())) <= 0.001
 
 def GetHeterozygosity(allele_freqs):
@@ -274,7 +274,7 @@ def GetVariance(allele_freqs):
     if not ValidateAlleleFreqs(allele_freqs):
         return np.nan
     mean = GetMean(allele_freqs)
-    return sum([allele_freqs[key]*(key-mean)**2 for key in allele_freqs.keys()])
+    return sum([freq*(key-mean)**2 for key, freq in allele_freqs.items()])
 
 def GetHardyWeinbergBinomialTest(allele_freqs, genotype_counts):
     r"""Compute Hardy Weinberg p-value
@@ -307,9 +307,9 @@ def GetHardyWeinbergBinomialTest(allele_freqs, genotype_counts):
     total_samples = sum(genotype_counts.values())
     num_hom = 0
     for gt in genotype_counts:
-        if gt[0] not in allele_freqs.keys():
+        if gt[0] not in allele_freqs:
             return np.nan
-        if gt[1] not in allele_freqs.keys():
+        if gt[1] not in allele_freqs:
             return np.nan
         if gt[0] == gt[1]: num_hom += genotype_counts[gt]
     return scipy.stats.binom_test(num_hom, n=total_samples, p=exp_hom_frac)